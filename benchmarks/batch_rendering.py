@@ -0,0 +1,49 @@
+"""Benchmark of :func:`ml_model_utils.plotting.render_batch` with an increasing number
+of worker processes.
+
+Run it with::
+
+    $ python -m benchmarks.batch_rendering --plots 200 --labels 50
+"""
+import argparse
+import os
+import time
+import numpy as np
+from ml_model_utils.constants import PlotKind
+from ml_model_utils.plotting import render_batch
+
+
+def make_specs(n_plots: int, n_labels: int, n_rows: int, seed: int = 0):
+    """Create confusion matrix specifications on random predictions."""
+    rng = np.random.default_rng(seed)
+    specs = []
+    for _ in range(n_plots):
+        y_test = rng.integers(0, n_labels, n_rows)
+        y_pred = np.where(rng.random(n_rows) < 0.7, y_test, rng.integers(0, n_labels, n_rows))
+        specs.append(dict(kind=PlotKind.CONFUSION_MATRIX, y_test=y_test, y_pred=y_pred,
+                          figure_size=2))
+    return specs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plots", type=int, default=100)
+    parser.add_argument("--labels", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    specs = make_specs(args.plots, args.labels, args.rows)
+    workers = 1
+    baseline = None
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        render_batch(specs, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"workers={workers:<3d} time={elapsed:8.2f}s "
+              f"plots/s={args.plots / elapsed:7.1f} speedup={baseline / elapsed:5.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import os
+import socket
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption("--max-rows", type=int, default=10 ** 5,
+                     help="skip evaluation benchmarks with more rows, at most 10^8.")
+    parser.addoption("--max-classes", type=int, default=10 ** 3,
+                     help="skip evaluation benchmarks with more classes, at most 10^5.")
+
+
+@pytest.fixture
+def check_size(request):
+    """Skip the benchmark if it exceeds the configured number of rows or classes."""
+    def check(n_rows, n_classes):
+        if n_rows > request.config.getoption("--max-rows"):
+            pytest.skip("more rows than --max-rows")
+        if n_classes > request.config.getoption("--max-classes"):
+            pytest.skip("more classes than --max-classes")
+    return check
+
+
+@pytest.fixture(scope="session")
+def s3_endpoint():
+    """Start a local moto S3 server and point s3fs to it."""
+    server_module = pytest.importorskip("moto.server")
+    fsspec_config = pytest.importorskip("fsspec.config")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = server_module.ThreadedMotoServer(ip_address="127.0.0.1", port=port)
+    server.start()
+    endpoint_url = f"http://127.0.0.1:{port}"
+    previous_config = fsspec_config.conf.get("s3")
+    fsspec_config.conf["s3"] = dict(client_kwargs=dict(endpoint_url=endpoint_url))
+    yield endpoint_url
+    if previous_config is None:
+        fsspec_config.conf.pop("s3")
+    else:
+        fsspec_config.conf["s3"] = previous_config
+    server.stop()
+
+
+@pytest.fixture
+def tracking_uri(tmp_path):
+    """Local file store tracking uri in a temporary folder."""
+    mlflow = pytest.importorskip("mlflow")
+    uri = (tmp_path / "mlruns").as_uri()
+    mlflow.set_tracking_uri(uri)
+    yield uri
+    mlflow.set_tracking_uri(None)
+    mlflow.set_registry_uri(None)
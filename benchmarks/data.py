@@ -0,0 +1,66 @@
+"""Synthetic data generators for the benchmarks."""
+import os
+import numpy as np
+import pandas as pd  # type: ignore
+from typing import Any, Tuple
+
+LABEL_KINDS = ["integer", "string", "categorical", "arrow"]
+
+
+def make_labels(n_rows: int,
+                n_classes: int,
+                kind: str = "integer",
+                accuracy: float = 0.8,
+                seed: int = 0) -> Tuple[Any, Any]:
+    """Create random test labels and predictions, of which ``accuracy`` are correct.
+
+    Args:
+        n_rows (int): number of rows.
+        n_classes (int): number of classes.
+        kind (str): representation of the labels, one of ``integer`` (numpy integers),
+          ``string`` (numpy object array of python strings), ``categorical`` (pandas
+          categorical with string categories) or ``arrow`` (arrow dictionary array).
+        accuracy (float): share of correct predictions.
+        seed (int): random seed.
+
+    Returns:
+        tuple: test labels and predictions.
+    """
+    rng = np.random.default_rng(seed)
+    y_test = rng.integers(0, n_classes, n_rows, dtype=np.int32)
+    y_pred = np.where(rng.random(n_rows) < accuracy, y_test,
+                      rng.integers(0, n_classes, n_rows, dtype=np.int32))
+    if kind == "integer":
+        return y_test, y_pred
+    categories = np.array([f"class_{i}" for i in range(n_classes)], dtype=object)
+    if kind == "string":
+        return categories[y_test], categories[y_pred]
+    if kind == "categorical":
+        return (pd.Categorical.from_codes(y_test, categories),
+                pd.Categorical.from_codes(y_pred, categories))
+    if kind == "arrow":
+        import pyarrow as pa  # type: ignore
+        dictionary = pa.array(categories, type=pa.string())
+        return (pa.DictionaryArray.from_arrays(y_test, dictionary),
+                pa.DictionaryArray.from_arrays(y_pred, dictionary))
+    raise ValueError(f"Unknown label kind {kind}.")
+
+
+def make_predictions(n_rows: int, n_classes: int, n_models: int, seed: int = 0):
+    """Create random test labels and the predictions of several models with increasing
+    accuracy, as pandas categoricals sharing the same categories."""
+    y_test, _ = make_labels(n_rows, n_classes, "categorical", seed=seed)
+    predictions = {}
+    for i in range(n_models):
+        _, y_pred = make_labels(n_rows, n_classes, "categorical",
+                                accuracy=0.5 + 0.4 * i / max(n_models - 1, 1),
+                                seed=seed)
+        predictions[f"model_{i}"] = y_pred
+    return y_test, predictions
+
+
+def make_files(path: str, n_files: int, file_format: str = "parquet") -> None:
+    """Create empty files in the given folder, every other one with the given format."""
+    for i in range(n_files):
+        extension = file_format if i % 2 == 0 else "csv"
+        open(os.path.join(path, f"file_{i}.{extension}"), "w").close()
@@ -0,0 +1,49 @@
+import pytest
+from ml_model_utils.evaluation import (
+    create_confusion_matrix, create_classification_report, create_comparison_report,
+    create_agreement_report
+)
+from .data import LABEL_KINDS, make_labels, make_predictions
+
+ROWS = [10 ** 5, 10 ** 6, 10 ** 7, 10 ** 8]
+CLASSES = [10, 10 ** 3, 10 ** 5]
+
+
+@pytest.mark.parametrize("kind", LABEL_KINDS)
+@pytest.mark.parametrize("n_classes", CLASSES)
+@pytest.mark.parametrize("n_rows", ROWS)
+def test_create_classification_report(benchmark, check_size, n_rows, n_classes, kind):
+    check_size(n_rows, n_classes)
+    if kind == "arrow":
+        pytest.importorskip("pyarrow")
+    y_test, y_pred = make_labels(n_rows, n_classes, kind)
+    benchmark.pedantic(create_classification_report, args=(y_test, y_pred), rounds=3)
+
+
+# the confusion matrix itself has n_classes^2 cells, 10^5 classes don't fit into memory
+@pytest.mark.parametrize("kind", LABEL_KINDS)
+@pytest.mark.parametrize("n_classes", CLASSES[:2])
+@pytest.mark.parametrize("n_rows", ROWS)
+def test_create_confusion_matrix(benchmark, check_size, n_rows, n_classes, kind):
+    check_size(n_rows, n_classes)
+    if kind == "arrow":
+        pytest.importorskip("pyarrow")
+    y_test, y_pred = make_labels(n_rows, n_classes, kind)
+    benchmark.pedantic(create_confusion_matrix, args=(y_test, y_pred), rounds=3)
+
+
+@pytest.mark.parametrize("n_models", [5, 20])
+@pytest.mark.parametrize("n_classes", CLASSES)
+@pytest.mark.parametrize("n_rows", ROWS)
+def test_create_comparison_report(benchmark, check_size, n_rows, n_classes, n_models):
+    check_size(n_rows, n_classes)
+    y_test, predictions = make_predictions(n_rows, n_classes, n_models)
+    benchmark.pedantic(create_comparison_report, args=(y_test, predictions), rounds=3)
+
+
+@pytest.mark.parametrize("n_models", [5, 20])
+@pytest.mark.parametrize("n_rows", ROWS)
+def test_create_agreement_report(benchmark, check_size, n_rows, n_models):
+    check_size(n_rows, 10)
+    y_test, predictions = make_predictions(n_rows, 10, n_models)
+    benchmark.pedantic(create_agreement_report, args=(y_test, predictions), rounds=3)
@@ -0,0 +1,26 @@
+import pytest
+from ml_model_utils.files import get_local_files, get_s3_files
+from .data import make_files
+
+
+@pytest.mark.parametrize("n_files", [10, 1000, 10000])
+def test_get_local_files(benchmark, tmp_path, n_files):
+    make_files(str(tmp_path), n_files)
+    result = benchmark(lambda: list(get_local_files(str(tmp_path))))
+    assert len(result) == (n_files + 1) // 2
+
+
+@pytest.mark.parametrize("n_files", [10, 1000])
+def test_get_s3_files(benchmark, s3_endpoint, n_files):
+    boto3 = pytest.importorskip("boto3")
+    from s3fs import S3FileSystem  # type: ignore
+    bucket = f"benchmark-{n_files}"
+    client = boto3.client("s3", endpoint_url=s3_endpoint)
+    client.create_bucket(Bucket=bucket)
+    for i in range(n_files):
+        extension = "parquet" if i % 2 == 0 else "csv"
+        client.put_object(Bucket=bucket, Key=f"data/file_{i}.{extension}", Body=b"0")
+    # s3fs caches file systems and their listings, so start every round without them
+    result = benchmark.pedantic(lambda: list(get_s3_files(f"s3://{bucket}/data")),
+                                setup=S3FileSystem.clear_instance_cache, rounds=5)
+    assert len(result) == (n_files + 1) // 2
@@ -0,0 +1,25 @@
+import pytest
+from ml_model_utils.mlflow import log_metrics, upload_model
+
+
+@pytest.mark.parametrize("n_metrics", [10, 100])
+def test_log_metrics(benchmark, tracking_uri, n_metrics):
+    import mlflow  # type: ignore
+    metrics = {f"metric_{i}": 0.9 for i in range(n_metrics)}
+    mlflow.set_experiment("benchmark")
+    with mlflow.start_run():
+        benchmark(log_metrics, metrics)
+
+
+def test_upload_model(benchmark, tmp_path, tracking_uri):
+    import mlflow  # type: ignore
+    pytest.importorskip("sqlalchemy")
+    pytest.importorskip("alembic")
+    from sklearn.linear_model import LogisticRegression  # type: ignore
+    # the file store doesn't support the model registry, use a local sqlite one
+    mlflow.set_registry_uri(f"sqlite:///{tmp_path / 'registry.db'}")
+    model = LogisticRegression().fit([[0.0], [1.0]], [0, 1])
+    benchmark.pedantic(upload_model,
+                       args=(tracking_uri, "benchmark", "benchmark_model", "classifier",
+                             model, dict(precision=0.91, recall=0.90, f1_score=0.905)),
+                       rounds=3)
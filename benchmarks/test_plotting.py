@@ -0,0 +1,33 @@
+import os
+import matplotlib.pyplot as plt  # type: ignore
+import pytest
+from ml_model_utils.constants import PlotKind
+from ml_model_utils.plotting import (
+    plot_confusion_matrix, render_confusion_matrix, render_batch
+)
+from .data import make_labels
+
+
+@pytest.mark.parametrize("n_classes", [10, 100])
+def test_plot_confusion_matrix(benchmark, tmp_path, n_classes):
+    y_test, y_pred = make_labels(10 ** 4, n_classes)
+    output_path = str(tmp_path / "cm.png")
+    benchmark.pedantic(plot_confusion_matrix, args=(y_test, y_pred, 2),
+                       kwargs=dict(output_path=output_path), rounds=3)
+    plt.close("all")
+
+
+@pytest.mark.parametrize("n_classes", [10, 100, 1000])
+def test_render_confusion_matrix(benchmark, n_classes):
+    y_test, y_pred = make_labels(10 ** 5, n_classes)
+    benchmark.pedantic(render_confusion_matrix, args=(y_test, y_pred, 2), rounds=3)
+
+
+@pytest.mark.parametrize("max_workers", sorted({1, os.cpu_count() or 1}))
+def test_render_batch(benchmark, max_workers):
+    specs = []
+    for seed in range(16):
+        y_test, y_pred = make_labels(10 ** 4, 20, seed=seed)
+        specs.append(dict(kind=PlotKind.CONFUSION_MATRIX, y_test=y_test, y_pred=y_pred,
+                          figure_size=2))
+    benchmark.pedantic(render_batch, args=(specs, max_workers), rounds=3)
@@ -0,0 +1,391 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle  # nosec
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from enum import Enum
+import numpy as np
+import pandas as pd  # type: ignore
+import sklearn  # type: ignore
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+from .version import __version__
+
+try:
+    import xxhash  # type: ignore
+except ImportError:  # pragma: no cover
+    xxhash = None  # type: ignore[assignment]
+
+try:
+    import pyarrow as pa  # type: ignore
+except ImportError:  # pragma: no cover
+    pa = None
+
+CACHE_FILE_EXTENSION = ".pkl"
+TEMPORARY_FILE_EXTENSION = ".tmp"
+# temporary files older than this are left over from killed writers
+TEMPORARY_FILE_MAX_AGE = 60 * 60
+# results computed or pickled by other versions must not be reused
+ENVIRONMENT = (f"ml_model_utils={__version__};scikit-learn={sklearn.__version__};"
+               f"pandas={pd.__version__};numpy={np.__version__}")
+SCALAR_TYPES = (str, bytes, bool, int, float, complex, type(None), np.generic, Enum)
+
+
+class UnhashableValueError(TypeError):
+    """Raised for values whose content can't be hashed, calls with them aren't cached."""
+
+
+def _new_hasher() -> Any:
+    """Return a fast 128 bit hasher, xxh3 if xxhash is installed, otherwise blake2b."""
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+def _update_hash(hasher: Any, value: Any) -> None:
+    """Feed the content of the value into the hasher, array data is hashed on its raw
+    buffers without converting it to python objects."""
+    hasher.update(type(value).__name__.encode())
+    if isinstance(value, (pd.Series, pd.Index)):
+        is_extension = isinstance(value.dtype, pd.api.extensions.ExtensionDtype)
+        _update_hash(hasher, value.array if is_extension else value.to_numpy())
+    elif isinstance(value, pd.DataFrame):
+        _update_hash(hasher, value.columns)
+        _update_hash(hasher, value.index)
+        for _, column in value.items():
+            _update_hash(hasher, column)
+    elif isinstance(value, pd.Categorical):
+        _update_hash(hasher, value.codes)
+        _update_hash(hasher, value.categories)
+    elif isinstance(value, pd.api.extensions.ExtensionArray):
+        hasher.update(str(value.dtype).encode())
+        _update_hash(hasher, pd.util.hash_pandas_object(pd.Series(value), index=False).to_numpy())
+    elif isinstance(value, np.ndarray):
+        hasher.update(f"{value.dtype.str}{value.shape}".encode())
+        if value.dtype == object:
+            hasher.update(pd.api.types.infer_dtype(value, skipna=False).encode())
+            value = pd.util.hash_array(value.ravel())
+        hasher.update(np.ascontiguousarray(value).reshape(-1).view(np.uint8))
+    elif pa is not None and isinstance(value, pa.ChunkedArray):
+        for chunk in value.chunks:
+            _update_hash(hasher, chunk)
+    elif pa is not None and isinstance(value, pa.Array):
+        if pa.types.is_dictionary(value.type):
+            _update_hash(hasher, value.indices)
+            _update_hash(hasher, value.dictionary)
+        else:
+            hasher.update(f"{value.type}{value.offset}:{len(value)}".encode())
+            for buffer in value.buffers():
+                hasher.update(memoryview(buffer) if buffer is not None else b"-")
+    elif isinstance(value, (list, tuple)):
+        _update_hash(hasher, np.asarray(value, dtype=object))
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            _update_hash(hasher, k)
+            _update_hash(hasher, v)
+    elif isinstance(value, SCALAR_TYPES):
+        hasher.update(repr(value).encode())
+    elif hasattr(value, "__array__"):
+        _update_hash(hasher, np.asarray(value))
+    else:
+        raise UnhashableValueError(f"Can't hash the content of {type(value).__name__}.")
+
+
+def content_hash(*values: Any) -> str:
+    """Compute a content hash of the given values.
+
+    Args:
+        *values (any): values to hash, e.g. label vectors as lists, numpy arrays, pandas or
+          arrow objects, and scalar arguments.
+
+    Returns:
+        str: hexadecimal digest.
+
+    Raises:
+        UnhashableValueError: if the content of a value can't be hashed.
+
+    Examples:
+        >>> content_hash([1, 2, 3], [2, 1, 3]) == content_hash([1, 2, 3], [2, 1, 3])
+        True
+        >>> content_hash([1, 2, 3], [2, 1, 3]) == content_hash(["1", "2", "3"], [2, 1, 3])
+        False
+    """
+    hasher = _new_hasher()
+    for value in values:
+        _update_hash(hasher, value)
+    return hasher.hexdigest()
+
+
+def _size_of(value: Any) -> int:
+    """Approximate memory size of a cached result in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, tuple):
+        return sum(_size_of(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _copy(value: Any) -> Any:
+    """Copy a cached result, so callers can't modify the cached one."""
+    if isinstance(value, tuple):
+        return tuple(_copy(v) for v in value)
+    return value.copy() if hasattr(value, "copy") else value
+
+
+class CacheStatistics(NamedTuple):
+    """Hit and miss counts of an :obj:`EvaluationCache`."""
+    memory_hits: int
+    disk_hits: int
+    misses: int
+
+    @property
+    def hit_rate(self) -> float:
+        """float: share of lookups served from memory or disk."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+class EvaluationCache:
+    """Two tier cache of evaluation results keyed by the content hash of the arguments.
+
+    Results are kept in memory in least recently used order. With a directory, they are
+    also pickled to disk, so other processes and later runs can reuse them. Both tiers
+    evict the least recently used results once their size limit is exceeded.
+
+    Only use a directory which is not writable by untrusted users, the results are loaded
+    with pickle.
+
+    Args:
+        directory (str, optional): folder for the disk tier. If none, only the memory tier
+          is used.
+        max_memory_bytes (int, optional): size limit of the memory tier. Default is 256 MB.
+        max_disk_bytes (int, optional): size limit of the disk tier. Default is 1 GB.
+
+    Examples:
+        >>> cache = EvaluationCache("/tmp/evaluation_cache")
+        >>> cache.get_or_compute(create_confusion_matrix, ([1, 2], [2, 1]), {})
+           1  2
+        1  0  1
+        2  1  0
+        >>> cache.statistics
+        CacheStatistics(memory_hits=0, disk_hits=0, misses=1)
+    """
+
+    def __init__(self,
+                 directory: Optional[str] = None,
+                 max_memory_bytes: int = 256 * 2 ** 20,
+                 max_disk_bytes: int = 2 ** 30):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def statistics(self) -> CacheStatistics:
+        """:obj:`CacheStatistics`: hit and miss counts since creation or the last clear."""
+        return CacheStatistics(self._memory_hits, self._disk_hits, self._misses)
+
+    def key(self, func: Callable, args: Tuple, kwargs: Dict[str, Any]) -> str:
+        """Compute the cache key of a function call, independent of whether the arguments
+        are passed by position or keyword, and specific to the installed versions of
+        ml_model_utils, scikit-learn, pandas and numpy."""
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        return content_hash(ENVIRONMENT, f"{func.__module__}.{func.__qualname__}",
+                            bound.arguments)
+
+    def get_or_compute(self, func: Callable, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        """Return the cached result of the function call, or call it and cache the result.
+
+        Args:
+            func (callable): function to call.
+            args (tuple): positional arguments.
+            kwargs (:obj:`dict` of (str, any)): keyword arguments.
+
+        Returns:
+            any: result of the function call. Calls with arguments whose content can't be
+            hashed are not cached.
+        """
+        try:
+            key = self.key(func, args, kwargs)
+        except UnhashableValueError:
+            return func(*args, **kwargs)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._memory_hits += 1
+                return _copy(self._memory[key][0])
+        result = self._load(key)
+        if result is not None:
+            with self._lock:
+                self._disk_hits += 1
+        else:
+            result = func(*args, **kwargs)
+            with self._lock:
+                self._misses += 1
+            self._dump(key, result)
+        self._remember(key, result)
+        return _copy(result)
+
+    def clear(self) -> None:
+        """Remove all cached results from memory and disk and reset the statistics."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._memory_hits = self._disk_hits = self._misses = 0
+        for path in self._disk_files(include_temporary=True):
+            _remove(path)
+
+    def _remember(self, key: str, result: Any) -> None:
+        """Put the result into the memory tier and evict the least recently used ones."""
+        size = _size_of(result)
+        if size > self.max_memory_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                return
+            self._memory[key] = (result, size)
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                _, (_, evicted_size) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted_size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_FILE_EXTENSION)  # type: ignore
+
+    def _disk_files(self, include_temporary: bool = False):
+        if not self.directory:
+            return []
+        extensions: Tuple[str, ...] = (CACHE_FILE_EXTENSION,)
+        if include_temporary:
+            extensions += (TEMPORARY_FILE_EXTENSION,)
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                if name.endswith(extensions)]
+
+    def _load(self, key: str) -> Any:
+        """Load the result from the disk tier, None if it isn't cached there."""
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)  # nosec
+            os.utime(path)
+        # files written by other library versions can fail in many ways, count them as misses
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError,
+                TypeError, ValueError, IndexError):
+            return None
+        return result
+
+    def _dump(self, key: str, result: Any) -> None:
+        """Write the result to the disk tier and evict the least recently used ones."""
+        if not self.directory:
+            return
+        # write to a temporary file first, so other processes never read partial results
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=TEMPORARY_FILE_EXTENSION)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            _remove(tmp_path)
+            warnings.warn(f"Evaluation result couldn't be written to the disk cache: {e}")
+            return
+
+        # temporary files of running writers count towards the size limit, but only stale
+        # ones of killed writers are removed
+        stale_before = time.time() - TEMPORARY_FILE_MAX_AGE
+        total = 0
+        files = []
+        for path in self._disk_files(include_temporary=True):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if path.endswith(TEMPORARY_FILE_EXTENSION):
+                if stat.st_mtime < stale_before:
+                    _remove(path)
+                else:
+                    total += stat.st_size
+                continue
+            total += stat.st_size
+            files.append((stat.st_mtime, stat.st_size, path))
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            _remove(path)
+            total -= size
+
+
+def _remove(path: str) -> None:
+    """Remove the file, if another process hasn't done it already."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+_CACHE: Optional[EvaluationCache] = None
+
+
+def enable_cache(directory: Optional[str] = None,
+                 max_memory_bytes: int = 256 * 2 ** 20,
+                 max_disk_bytes: int = 2 ** 30) -> EvaluationCache:
+    """Enable caching of the evaluation functions for the current process.
+
+    The arguments are hashed with xxh3 if xxhash is installed, e.g. with
+    ``pip install ml_model_utils[cache]``, otherwise with the slower blake2b.
+
+    Args:
+        directory (str, optional): folder for the disk tier. If none, results are only
+          cached in memory.
+        max_memory_bytes (int, optional): size limit of the memory tier. Default is 256 MB.
+        max_disk_bytes (int, optional): size limit of the disk tier. Default is 1 GB.
+
+    Returns:
+        :obj:`EvaluationCache`: the enabled cache, e.g. to read its statistics.
+
+    Examples:
+        >>> cache = enable_cache("/tmp/evaluation_cache")
+        >>> report = create_classification_report(y_test, y_pred)
+        >>> cache.statistics.hit_rate
+        0.0
+    """
+    global _CACHE
+    _CACHE = EvaluationCache(directory, max_memory_bytes, max_disk_bytes)
+    return _CACHE
+
+
+def disable_cache() -> None:
+    """Disable caching of the evaluation functions. Results on disk are kept."""
+    global _CACHE
+    _CACHE = None
+
+
+def get_cache() -> Optional[EvaluationCache]:
+    """Return the enabled cache, None if caching is disabled."""
+    return _CACHE
+
+
+def cached(func: Callable) -> Callable:
+    """Decorate a function to use the enabled :obj:`EvaluationCache`, if any."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _CACHE is None:
+            return func(*args, **kwargs)
+        return _CACHE.get_or_compute(func, args, kwargs)
+    return wrapper
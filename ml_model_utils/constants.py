@@ -7,3 +7,10 @@ class MlflowModelStage(Enum):
     ARCHIVED = "Archived"
     PRODUCTION = "Production"
     NONE = "None"
+
+
+class PlotKind(Enum):
+    """Enumeration for the plots supported by batch rendering: confusion matrix and
+    distribution histogram."""
+    CONFUSION_MATRIX = "confusion_matrix"
+    DISTRIBUTION_HIST = "distribution_hist"
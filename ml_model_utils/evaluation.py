@@ -1,13 +1,154 @@
 import numpy as np
 import pandas as pd  # type: ignore
 from sklearn.metrics import confusion_matrix, classification_report  # type: ignore
-from typing import Optional, List, Any, Sequence
+from typing import Optional, List, Any, Sequence, Tuple, Dict
+from .cache import cached
 
+try:
+    import pyarrow as pa  # type: ignore
+except ImportError:  # pragma: no cover
+    pa = None
 
+OTHER_LABEL = "other"
+REPORT_COLUMNS = ['precision', 'recall', 'f1-score', 'support']
+COMPARISON_COLUMNS = ['accuracy',
+                      'macro avg precision', 'macro avg recall', 'macro avg f1-score',
+                      'weighted avg precision', 'weighted avg recall', 'weighted avg f1-score',
+                      'support']
+COMPARISON_CHUNK_SIZE = 2 ** 20
+
+
+def _is_arrow(values: Any) -> bool:
+    """Check whether the values are an arrow array."""
+    return pa is not None and isinstance(values, (pa.Array, pa.ChunkedArray))
+
+
+def _is_categorical(values: Any) -> bool:
+    """Check whether the values are pandas categorical or arrow dictionary encoded."""
+    if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+        return True
+    return _is_arrow(values) and pa.types.is_dictionary(values.type)
+
+
+def _codes_and_categories(values: Any) -> Tuple[np.ndarray, pd.Index]:
+    """Return the integer codes and categories of the values, reusing the codes of
+    categorical inputs and the indices of arrow dictionary arrays without copying them."""
+    if _is_arrow(values) and pa.types.is_dictionary(values.type):
+        if values.null_count:
+            raise ValueError("Input contains missing labels.")
+        if isinstance(values, pa.ChunkedArray):
+            chunks = values.unify_dictionaries().chunks
+            if not chunks:
+                dictionary = pa.array([], type=values.type.value_type)
+                codes = np.empty(0, dtype=np.intp)
+            elif len(chunks) == 1:
+                dictionary = chunks[0].dictionary
+                codes = chunks[0].indices.to_numpy()
+            else:
+                # indices of several chunks aren't contiguous, only they get concatenated
+                dictionary = chunks[0].dictionary
+                codes = np.concatenate([chunk.indices.to_numpy() for chunk in chunks])
+        else:
+            dictionary = values.dictionary
+            codes = values.indices.to_numpy()
+        return codes, pd.Index(dictionary.to_pandas())
+    if _is_arrow(values):
+        values = values.to_pandas()
+    if isinstance(values, pd.Categorical):
+        categorical = values
+    elif isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+        categorical = values.array
+    else:
+        categorical = pd.Categorical(values)
+    if (categorical.codes < 0).any():
+        raise ValueError("Input contains missing labels.")
+    return categorical.codes, categorical.categories
+
+
+def _encode_categorical(*values: Any) -> Tuple[List[np.ndarray], pd.Index]:
+    """Encode the given label vectors as integer codes into one shared set of categories.
+
+    Codes of inputs already using the shared categories are returned as they are.
+    """
+    lengths = [len(v) for v in values]
+    if len(set(lengths)) > 1:
+        raise ValueError("Found input variables with inconsistent numbers of samples: "
+                         f"{lengths}")
+    encoded = [_codes_and_categories(v) for v in values]
+    categories = encoded[0][1]
+    for _, other_categories in encoded[1:]:
+        if not other_categories.equals(categories):
+            categories = categories.append(other_categories.difference(categories))
+    codes = []
+    for code, own_categories in encoded:
+        if not own_categories.equals(categories):
+            code = categories.get_indexer(own_categories)[code]
+        codes.append(code)
+    return codes, categories
+
+
+def _count_confusion(codes_test: np.ndarray,
+                     codes_pred: np.ndarray,
+                     label_codes: np.ndarray,
+                     n_categories: int) -> np.ndarray:
+    """Count the confusion matrix of the given label codes, -1 marks an unknown label."""
+    n_labels = len(label_codes)
+    known = label_codes >= 0
+    position = np.full(n_categories, -1, dtype=np.intp)
+    position[label_codes[known]] = np.flatnonzero(known)
+    rows = position[codes_test]
+    cols = position[codes_pred]
+    mask = (rows >= 0) & (cols >= 0)
+    cm = np.bincount(rows[mask] * n_labels + cols[mask], minlength=n_labels * n_labels)
+    return cm.reshape(n_labels, n_labels)
+
+
+def _report_from_counts(tp: np.ndarray,
+                        true_sum: np.ndarray,
+                        pred_sum: np.ndarray,
+                        labels: List[str]) -> pd.DataFrame:
+    """Build the classification report from per label true positives, supports and
+    prediction counts, in the layout of :func:`create_classification_report`."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(pred_sum > 0, tp / pred_sum, 0.0)
+        recall = np.where(true_sum > 0, tp / true_sum, 0.0)
+        f1 = np.where(true_sum + pred_sum > 0, 2 * tp / (true_sum + pred_sum), 0.0)
+    scores = np.column_stack([precision, recall, f1])
+    total = true_sum.sum()
+    weights = true_sum / total if total else np.zeros(len(true_sum))
+    accuracy = tp.sum() / total if total else 0.0
+    rows = np.vstack([np.column_stack([scores, true_sum]),
+                      [accuracy] * 4,
+                      np.append(scores.mean(axis=0), total),
+                      np.append(weights @ scores, total)])
+    return pd.DataFrame(rows.astype(float),
+                        index=labels + ["accuracy", "macro avg", "weighted avg"],
+                        columns=REPORT_COLUMNS)
+
+
+def _classification_report_from_codes(codes_test: np.ndarray,
+                                      codes_pred: np.ndarray,
+                                      categories: pd.Index) -> pd.DataFrame:
+    """Create the classification report of encoded labels by counting on their codes."""
+    n_categories = len(categories)
+    true_sum = np.bincount(codes_test, minlength=n_categories)
+    pred_sum = np.bincount(codes_pred, minlength=n_categories)
+    tp = np.bincount(codes_test[codes_test == codes_pred], minlength=n_categories)
+    present = np.flatnonzero(true_sum + pred_sum)
+    present = present[categories[present].argsort()]
+    return _report_from_counts(tp[present], true_sum[present], pred_sum[present],
+                               [str(label) for label in categories[present]])
+
+
+@cached
 def create_classification_report(y_test: Sequence[Any],
                                  y_pred: Sequence[Any]) -> pd.DataFrame:
     """Create a classification report and convert it to pandas DataFrame format.
 
+    Pandas categorical and arrow dictionary encoded inputs are counted directly on their
+    integer codes, without converting the labels to python objects. The result is cached
+    if caching is enabled with :func:`ml_model_utils.cache.enable_cache`.
+
      Args:
         y_test (:obj:`list` of any): labels in test data.
         y_pred (:obj:`list` of any): predictions for the test data.
@@ -28,17 +169,25 @@ def create_classification_report(y_test: Sequence[Any],
         macro avg           0.6     0.6       0.6      5.0
         weighted avg        0.6     0.6       0.6      5.0
     """
+    if _is_categorical(y_test) or _is_categorical(y_pred):
+        (codes_test, codes_pred), categories = _encode_categorical(y_test, y_pred)
+        return _classification_report_from_codes(codes_test, codes_pred, categories)
     report = classification_report(y_test, y_pred, output_dict=True, zero_division=0)
     df_report = pd.DataFrame(report).transpose()
     return df_report
 
 
+@cached
 def create_confusion_matrix(y_test: Sequence[Any],
                             y_pred: Sequence[Any],
                             percentage: bool = False,
                             selected_labels: Optional[List[Any]] = None) -> pd.DataFrame:
     """Create confusion matrix in pandas DataFrame format.
 
+    Pandas categorical and arrow dictionary encoded inputs are counted directly on their
+    integer codes, the category names are only used for the index and columns. The result
+    is cached if caching is enabled with :func:`ml_model_utils.cache.enable_cache`.
+
     Args:
         y_test (:obj:`list` of any): labels in test data.
         y_pred (:obj:`list` of any): predictions for the test data.
@@ -58,9 +207,177 @@ def create_confusion_matrix(y_test: Sequence[Any],
         4  0  0  0  1  0
         5  0  0  0  0  1
     """
-    labels = sorted(selected_labels if selected_labels else set(y_test))
-    cm = confusion_matrix(y_test, y_pred, labels=labels)
+    if _is_categorical(y_test) or _is_categorical(y_pred):
+        (codes_test, codes_pred), categories = _encode_categorical(y_test, y_pred)
+        if selected_labels:
+            labels = sorted(selected_labels)
+        else:
+            present = np.flatnonzero(np.bincount(codes_test, minlength=len(categories)))
+            labels = sorted(categories[present])
+        cm = _count_confusion(codes_test, codes_pred, categories.get_indexer(labels),
+                              len(categories))
+    else:
+        labels = sorted(selected_labels if selected_labels else set(y_test))
+        cm = confusion_matrix(y_test, y_pred, labels=labels)
     if percentage:
         cm = np.round(100 * cm / np.sum(cm, axis=1).reshape(-1, 1))
     cm_df = pd.DataFrame(cm, index=labels, columns=labels)
     return cm_df
+
+
+def select_top_confused(cm_df: pd.DataFrame,
+                        top_k: int,
+                        aggregate_others: bool = False) -> pd.DataFrame:
+    """Slice a confusion matrix to the labels involved in the most misclassifications.
+
+    Labels are ranked by the number of off-diagonal counts in their row and column, i.e.
+    how often they were missed plus how often they were wrongly predicted.
+
+    Args:
+        cm_df (:obj:`pandas.DataFrame`): confusion matrix with counts, as returned by
+          :func:`create_confusion_matrix`.
+        top_k (int): number of labels to keep.
+        aggregate_others (bool, optional): add an extra ``"other"`` row and column holding the
+          counts of all dropped labels, so no sample gets lost. Default is False.
+
+    Returns:
+        :obj:`pandas.DataFrame`: confusion matrix of the top k confused labels, ordered by
+        descending number of misclassifications.
+
+    Examples:
+        >>> cm_df = create_confusion_matrix([1, 2, 3, 4, 5], [2, 1, 3, 4, 5])
+        >>> select_top_confused(cm_df, 2, aggregate_others=True)
+               1  2  other
+        1      0  1      0
+        2      1  0      0
+        other  0  0      3
+    """
+    if top_k >= len(cm_df):
+        return cm_df
+    cm = cm_df.to_numpy()
+    errors = cm.sum(axis=0) + cm.sum(axis=1) - 2 * np.diag(cm)
+    top = np.argsort(-errors, kind="stable")[:top_k]
+    labels = list(cm_df.index[top])
+    if not aggregate_others:
+        return cm_df.iloc[top, top]
+    rest = np.setdiff1d(np.arange(len(cm_df)), top)
+    aggregated = np.zeros((top_k + 1, top_k + 1), dtype=cm.dtype)
+    aggregated[:top_k, :top_k] = cm[np.ix_(top, top)]
+    aggregated[:top_k, top_k] = cm[np.ix_(top, rest)].sum(axis=1)
+    aggregated[top_k, :top_k] = cm[np.ix_(rest, top)].sum(axis=0)
+    aggregated[top_k, top_k] = cm[np.ix_(rest, rest)].sum()
+    labels.append(OTHER_LABEL)
+    return pd.DataFrame(aggregated, index=labels, columns=labels)
+
+
+def _stacked_chunks(codes_test: np.ndarray, codes_preds: List[np.ndarray]):
+    """Yield the test codes and the stacked prediction codes of all models in row chunks,
+    so only ``n_models * COMPARISON_CHUNK_SIZE`` codes are copied at a time."""
+    for start in range(0, len(codes_test), COMPARISON_CHUNK_SIZE):
+        end = start + COMPARISON_CHUNK_SIZE
+        yield start, codes_test[start:end], np.vstack([c[start:end] for c in codes_preds])
+
+
+def create_comparison_report(y_test: Sequence[Any],
+                             predictions: Dict[str, Sequence[Any]]) -> pd.DataFrame:
+    """Compare the predictions of several models on the same test data side by side.
+
+    The labels are encoded once for all models, and all models are counted together with
+    one vectorized pass over each chunk of rows of the shared integer codes. The metrics
+    are the same as the summary rows of :func:`create_classification_report`.
+
+    Args:
+        y_test (:obj:`list` of any): labels in test data.
+        predictions (:obj:`dict` of (str, :obj:`list` of any)): predictions for the test data
+          by model name.
+
+    Returns:
+        :obj:`pandas.DataFrame`: one row of metrics per model, and an ``exclusive correct``
+        column counting the rows only this model predicts correctly.
+
+    Examples:
+        >>> create_comparison_report([1, 2, 3, 4, 5], dict(champion=[1, 2, 3, 4, 4],
+        ...                                                challenger=[2, 1, 3, 4, 5]))
+                    accuracy  macro avg precision  ...  support  exclusive correct
+        champion         0.8                  0.7  ...      5.0                  2
+        challenger       0.6                  0.6  ...      5.0                  1
+        <BLANKLINE>
+        [2 rows x 9 columns]
+    """
+    if not predictions:
+        raise ValueError("At least one model's predictions are required.")
+    names = list(predictions)
+    codes, categories = _encode_categorical(y_test, *predictions.values())
+    codes_test = codes[0]
+    n_models, n_categories = len(names), len(categories)
+
+    # count all models at once, offsetting the codes of each model by its index
+    offsets = (np.arange(n_models, dtype=np.intp) * n_categories)[:, None]
+    true_sum = np.bincount(codes_test, minlength=n_categories)
+    pred_sum = np.zeros(n_models * n_categories, dtype=np.int64)
+    tp = np.zeros(n_models * n_categories, dtype=np.int64)
+    exclusive_correct = np.zeros(n_models, dtype=np.int64)
+    for _, chunk_test, chunk_preds in _stacked_chunks(codes_test, codes[1:]):
+        flat_codes = chunk_preds + offsets
+        correct = chunk_preds == chunk_test
+        pred_sum += np.bincount(flat_codes.ravel(), minlength=n_models * n_categories)
+        tp += np.bincount(flat_codes[correct], minlength=n_models * n_categories)
+        exclusive_correct += (correct & (correct.sum(axis=0) == 1)).sum(axis=1)
+    pred_sum = pred_sum.reshape(n_models, n_categories)
+    tp = tp.reshape(n_models, n_categories)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(pred_sum > 0, tp / pred_sum, 0.0)
+        recall = np.where(true_sum > 0, tp / true_sum, 0.0)
+        f1 = np.where(true_sum + pred_sum > 0, 2 * tp / (true_sum + pred_sum), 0.0)
+    scores = np.stack([precision, recall, f1], axis=2)
+    # as in the classification report, the macro average only covers the labels present in
+    # the test data or the predictions of the model
+    present = (true_sum + pred_sum) > 0
+    n_present = np.maximum(present.sum(axis=1), 1)[:, None]
+    macro = (scores * present[:, :, None]).sum(axis=1) / n_present
+    total = true_sum.sum()
+    weighted = true_sum @ scores / total if total else np.zeros((n_models, 3))
+    accuracy = tp.sum(axis=1) / total if total else np.zeros(n_models)
+    table = pd.DataFrame(np.column_stack([accuracy, macro, weighted,
+                                          np.full(n_models, total)]).astype(float),
+                         index=names, columns=COMPARISON_COLUMNS)
+    table["exclusive correct"] = exclusive_correct
+    return table
+
+
+def create_agreement_report(y_test: Sequence[Any],
+                            predictions: Dict[str, Sequence[Any]]) -> pd.DataFrame:
+    """Compute per test row how much the predictions of several models agree.
+
+    Args:
+        y_test (:obj:`list` of any): labels in test data.
+        predictions (:obj:`dict` of (str, :obj:`list` of any)): predictions for the test data
+          by model name.
+
+    Returns:
+        :obj:`pandas.DataFrame`: per test row the columns ``n_correct`` (number of correct
+        models), ``n_distinct`` (number of distinct predictions) and ``all_agree``.
+
+    Examples:
+        >>> create_agreement_report([1, 2, 3], dict(champion=[1, 2, 2],
+        ...                                         challenger=[1, 3, 2]))
+           n_correct  n_distinct  all_agree
+        0          2           1       True
+        1          1           2      False
+        2          0           1       True
+    """
+    if not predictions:
+        raise ValueError("At least one model's predictions are required.")
+    codes, _ = _encode_categorical(y_test, *predictions.values())
+    codes_test = codes[0]
+    n_correct = np.empty(len(codes_test), dtype=np.int64)
+    n_distinct = np.empty(len(codes_test), dtype=np.int64)
+    for start, chunk_test, chunk_preds in _stacked_chunks(codes_test, codes[1:]):
+        end = start + len(chunk_test)
+        n_correct[start:end] = (chunk_preds == chunk_test).sum(axis=0)
+        chunk_preds.sort(axis=0)
+        n_distinct[start:end] = 1 + (np.diff(chunk_preds, axis=0) != 0).sum(axis=0)
+    return pd.DataFrame(dict(n_correct=n_correct,
+                             n_distinct=n_distinct,
+                             all_agree=n_distinct == 1))
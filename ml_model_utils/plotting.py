@@ -1,8 +1,16 @@
+import io
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib.pyplot as plt  # type: ignore
 import pandas as pd  # type: ignore
 import seaborn as sns  # type: ignore
-from typing import Optional, List, Any, Sequence
-from .evaluation import create_confusion_matrix
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # type: ignore
+from matplotlib.figure import Figure  # type: ignore
+from typing import Optional, List, Any, Sequence, Dict, Union, Callable
+from .constants import PlotKind
+from .evaluation import create_confusion_matrix, select_top_confused
+
+ANNOTATION_THRESHOLD = 30
 
 
 def distribution_hist(data: pd.DataFrame,
@@ -34,13 +42,53 @@ def distribution_hist(data: pd.DataFrame,
         plt.show()
 
 
+def render_distribution_hist(data: pd.DataFrame,
+                             col: str,
+                             figure_size: int,
+                             output_path: Optional[str] = None,
+                             dpi: int = 100) -> Optional[bytes]:
+    """ Render the histogram distribution of the column in the given data to PNG.
+
+    Same plot as :func:`distribution_hist`, but drawn on its own Agg figure without
+    touching the pyplot global state, so it is safe to use from worker processes.
+
+    Args:
+        data (:obj:`pandas.DataFrame`): dataset.
+        col (str): target column for the distribution to be observed.
+        figure_size (int): scale for the distribution plot.
+        output_path (str, optional): output image file path. If no output path is given,
+          the PNG content is returned as bytes.
+        dpi (int, optional): resolution of the image. Default is 100.
+
+    Returns:
+        bytes, optional: PNG content if no output path is given, otherwise None.
+
+    Examples:
+        >>> png = render_distribution_hist(df, "target", 2)
+    """
+    fig = Figure(figsize=(figure_size * 4, figure_size * 2), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    counts = data[col].value_counts()
+    sns.barplot(x=counts.index, y=counts.values, alpha=0.8, ax=ax)
+    ax.set_title(f"Distribution of the column {col}")
+    ax.set_ylabel('Number of Occurrences', fontsize=12)
+    ax.set_xlabel(col, fontsize=12)
+    ax.tick_params(axis="x", labelrotation=90)
+    return _save_figure(fig, output_path)
+
+
 def plot_confusion_matrix(y_test: Sequence[Any],
                           y_pred: Sequence[Any],
                           figure_size: int,
                           percentage: bool = False,
-                          selected_labels: Optional[List[Any]] = None):
+                          selected_labels: Optional[List[Any]] = None,
+                          output_path: Optional[str] = None):
     """ Confusion matrix plot of given test & preds using seaborn library.
 
+    Every cell gets its own text annotation, so for more than a few dozen labels
+    use :func:`render_confusion_matrix` instead.
+
     Args:
         y_test (:obj:`list` of any): labels in test data.
         y_pred (:obj:`list` of any): predictions for the test data.
@@ -49,6 +97,8 @@ def plot_confusion_matrix(y_test: Sequence[Any],
           exact numbers will be used in the confusion matrix. Default is False.
         selected_labels (:obj:`list` of :obj:`str`, optional): selected labels to slice the
           confusion matrix
+        output_path (str, optional): output image file path. If given, the plot is saved
+          to it and the figure is closed.
 
     Examples:
         >>> plot_confusion_matrix(test, pred, "target", 2)
@@ -56,3 +106,153 @@ def plot_confusion_matrix(y_test: Sequence[Any],
     df_cm = create_confusion_matrix(y_test, y_pred, percentage, selected_labels)
     plt.figure(figsize=(4 * figure_size, 3 * figure_size))
     sns.heatmap(df_cm, annot=True, cmap='Blues', fmt='g')
+    if output_path:
+        plt.savefig(output_path)
+        plt.close()
+
+
+def render_confusion_matrix(y_test: Sequence[Any],
+                            y_pred: Sequence[Any],
+                            figure_size: int,
+                            percentage: bool = False,
+                            selected_labels: Optional[List[Any]] = None,
+                            top_k: Optional[int] = None,
+                            aggregate_others: bool = False,
+                            annotation_threshold: int = ANNOTATION_THRESHOLD,
+                            output_path: Optional[str] = None,
+                            dpi: int = 100) -> Optional[bytes]:
+    """ Render a confusion matrix to PNG, suitable for thousands of labels.
+
+    The matrix is drawn as a single image with the Agg backend instead of one artist
+    per cell, and the pyplot global state is not touched. Cell values and tick labels
+    are only drawn when the matrix has at most ``annotation_threshold`` labels.
+
+    Args:
+        y_test (:obj:`list` of any): labels in test data.
+        y_pred (:obj:`list` of any): predictions for the test data.
+        figure_size (int): scale for the confusion matrix plot
+        percentage (bool, optional): boolean value that decides whether over the scale 100 or
+          exact numbers will be used in the confusion matrix. Default is False.
+        selected_labels (:obj:`list` of :obj:`str`, optional): selected labels to slice the
+          confusion matrix
+        top_k (int, optional): only plot the ``top_k`` most confused labels, see
+          :func:`ml_model_utils.evaluation.select_top_confused`.
+        aggregate_others (bool, optional): collect the labels dropped by ``top_k`` into an
+          ``"other"`` row and column. Default is False.
+        annotation_threshold (int, optional): maximal number of labels for which cells and
+          ticks are annotated. Default is 30.
+        output_path (str, optional): output image file path. If no output path is given,
+          the PNG content is returned as bytes.
+        dpi (int, optional): resolution of the image. Default is 100.
+
+    Returns:
+        bytes, optional: PNG content if no output path is given, otherwise None.
+
+    Examples:
+        >>> png = render_confusion_matrix(test, pred, 2, top_k=50)
+        >>> render_confusion_matrix(test, pred, 2, output_path="cm.png")
+    """
+    fig = _confusion_matrix_figure(y_test, y_pred, figure_size, percentage, selected_labels,
+                                   top_k, aggregate_others, annotation_threshold, dpi)
+    return _save_figure(fig, output_path)
+
+
+def _confusion_matrix_figure(y_test: Sequence[Any],
+                             y_pred: Sequence[Any],
+                             figure_size: int,
+                             percentage: bool,
+                             selected_labels: Optional[List[Any]],
+                             top_k: Optional[int],
+                             aggregate_others: bool,
+                             annotation_threshold: int,
+                             dpi: int) -> Figure:
+    """Draw the confusion matrix of :func:`render_confusion_matrix` on a new Agg figure."""
+    df_cm = create_confusion_matrix(y_test, y_pred, selected_labels=selected_labels)
+    if top_k:
+        df_cm = select_top_confused(df_cm, top_k, aggregate_others)
+    cm = df_cm.to_numpy()
+    if percentage:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cm = np.round(100 * cm / np.sum(cm, axis=1).reshape(-1, 1))
+
+    fig = Figure(figsize=(4 * figure_size, 3 * figure_size), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    image = ax.imshow(cm, cmap="Blues", interpolation="nearest", aspect="auto")
+    fig.colorbar(image, ax=ax)
+    ax.set_xlabel("Predicted label")
+    ax.set_ylabel("True label")
+    if len(df_cm) <= annotation_threshold:
+        ticks = np.arange(len(df_cm))
+        ax.set_xticks(ticks, labels=[str(label) for label in df_cm.columns], rotation=90)
+        ax.set_yticks(ticks, labels=[str(label) for label in df_cm.index])
+        threshold = np.nanmax(cm) / 2 if cm.size else 0
+        for (i, j), value in np.ndenumerate(cm):
+            ax.text(j, i, f"{value:g}", ha="center", va="center",
+                    color="white" if value > threshold else "black")
+    else:
+        ax.set_xticks([])
+        ax.set_yticks([])
+
+    return fig
+
+
+def _save_figure(fig: Figure, output_path: Optional[str]) -> Optional[bytes]:
+    """Write the figure as PNG to the output path, or return the PNG content, and
+    release the figure."""
+    try:
+        if output_path:
+            fig.savefig(output_path, format="png")
+            return None
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png")
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+RENDERERS: Dict[PlotKind, Callable[..., Optional[bytes]]] = {
+    PlotKind.CONFUSION_MATRIX: render_confusion_matrix,
+    PlotKind.DISTRIBUTION_HIST: render_distribution_hist,
+}
+
+
+def _render(spec: Dict[str, Any]) -> Union[bytes, str]:
+    """Render a single plot specification of :func:`render_batch`, returning the PNG
+    content or the output path."""
+    kwargs = dict(spec)
+    kind = PlotKind(kwargs.pop("kind"))
+    result = RENDERERS[kind](**kwargs)
+    return result if result is not None else kwargs["output_path"]
+
+
+def render_batch(specs: Sequence[Dict[str, Any]],
+                 max_workers: Optional[int] = None) -> List[Union[bytes, str]]:
+    """ Render many plots in parallel in a process pool.
+
+    Each specification is a dict with a ``kind`` key, a :obj:`PlotKind` or its value,
+    and the keyword arguments of the corresponding renderer,
+    :func:`render_confusion_matrix` or :func:`render_distribution_hist`. The renderers
+    only use the object-oriented Figure API, so no pyplot state is shared.
+
+    Args:
+        specs (:obj:`list` of :obj:`dict`): plot specifications.
+        max_workers (int, optional): number of worker processes. If none, the number of
+          CPUs is used. With 1, the plots are rendered in the current process.
+
+    Returns:
+        :obj:`list` of bytes or str: for each specification in the same order, the PNG
+        content, or the ``output_path`` if it has one.
+
+    Examples:
+        >>> from ml_model_utils.constants import PlotKind
+        >>> render_batch([dict(kind=PlotKind.CONFUSION_MATRIX, y_test=test, y_pred=pred,
+        ...                    figure_size=2, output_path="cm.png"),
+        ...               dict(kind="distribution_hist", data=df, col="target",
+        ...                    figure_size=2, output_path="dist.png")])
+        ['cm.png', 'dist.png']
+    """
+    if max_workers == 1:
+        return [_render(spec) for spec in specs]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_render, specs))
@@ -46,7 +46,7 @@ DEV_REQUIRED = _parse_requirements(os.path.join("requirements", "dev.txt"))
 DOC_REQUIRED = _parse_requirements(os.path.join("requirements", "doc.txt"))
 
 # What packages are optional?
-EXTRAS = {"docs": DOC_REQUIRED}
+EXTRAS = {"docs": DOC_REQUIRED, "cache": ["xxhash>=3.0"]}
 
 
 setup(name=NAME,
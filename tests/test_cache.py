@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+import pytest
+from unittest import mock
+from ml_model_utils import cache as cache_module
+from ml_model_utils.cache import (
+    content_hash, EvaluationCache, enable_cache, disable_cache, get_cache
+)
+from ml_model_utils.evaluation import create_confusion_matrix, create_classification_report
+
+
+@pytest.fixture
+def evaluation_cache(tmp_path):
+    yield enable_cache(str(tmp_path))
+    disable_cache()
+
+
+@pytest.mark.parametrize("values, other_values",
+                         [([1, 2, 3], [1, 2, 4]),
+                          ([1, 2, 3], ["1", "2", "3"]),
+                          (np.array([1, 2, 3]), np.array([1, 2, 3], dtype=np.int32)),
+                          (pd.Categorical(["a", "b"]), pd.Categorical(["a", "c"])),
+                          (pd.Categorical(["a", "b"]),
+                           pd.Categorical(["a", "b"], categories=["b", "a"]))])
+def test_content_hash(values, other_values):
+    assert content_hash(values) == content_hash(values)
+    assert content_hash(values) != content_hash(other_values)
+
+
+def test_content_hash_arrow():
+    pa = pytest.importorskip("pyarrow")
+    values = pa.array(["a", "b", "a"]).dictionary_encode()
+    assert content_hash(values) == content_hash(pa.array(["a", "b", "a"]).dictionary_encode())
+    assert content_hash(values) != content_hash(pa.array(["a", "b", "b"]).dictionary_encode())
+
+
+def test_evaluation_cache(evaluation_cache):
+    assert get_cache() is evaluation_cache
+    expected_result = create_confusion_matrix([1, 2, 3], [2, 1, 3])
+    result = create_confusion_matrix(y_test=[1, 2, 3], y_pred=[2, 1, 3], percentage=False)
+    pd.testing.assert_frame_equal(result, expected_result)
+    result.iloc[0, 0] = 100
+    pd.testing.assert_frame_equal(create_confusion_matrix([1, 2, 3], [2, 1, 3]),
+                                  expected_result)
+    create_classification_report([1, 2, 3], [2, 1, 3])
+    assert evaluation_cache.statistics == (2, 0, 2)
+    assert evaluation_cache.statistics.hit_rate == 0.5
+
+    # a new process only finds the results on disk
+    disk_cache = enable_cache(evaluation_cache.directory)
+    with mock.patch("ml_model_utils.evaluation.confusion_matrix") as mocked_confusion_matrix:
+        result = create_confusion_matrix([1, 2, 3], [2, 1, 3])
+        mocked_confusion_matrix.assert_not_called()
+    pd.testing.assert_frame_equal(result, expected_result)
+    assert disk_cache.statistics == (0, 1, 0)
+
+    disk_cache.clear()
+    create_confusion_matrix([1, 2, 3], [2, 1, 3])
+    assert disk_cache.statistics == (0, 0, 1)
+
+
+def test_evaluation_cache_eviction(tmp_path):
+    result = create_confusion_matrix([1, 2, 3], [2, 1, 3])
+    size = cache_module._size_of(result)
+    evaluation_cache = EvaluationCache(str(tmp_path), max_memory_bytes=2 * size,
+                                       max_disk_bytes=0)
+    for y_pred in ([1, 2, 3], [2, 1, 3], [3, 2, 1]):
+        evaluation_cache.get_or_compute(create_confusion_matrix.__wrapped__,
+                                        ([1, 2, 3], y_pred), {})
+    assert len(evaluation_cache._memory) == 2
+    assert evaluation_cache._memory_bytes <= 2 * size
+    assert not list(tmp_path.glob("*.pkl"))
+
+
+def test_cache_disabled():
+    disable_cache()
+    assert get_cache() is None
+    create_confusion_matrix([1, 2, 3], [2, 1, 3])
+
+
+@pytest.mark.parametrize("values",
+                         [pd.array([1, 2] * 1000, dtype="Int64"),
+                          pd.array(["a", "b"] * 1000, dtype="string"),
+                          pd.Series([1, 2] * 1000, dtype="Int64"),
+                          pd.DataFrame(dict(a=[1, 2] * 1000))])
+def test_content_hash_of_long_values(values):
+    other_values = values.copy()
+    if isinstance(other_values, pd.DataFrame):
+        other_values.iloc[1000, 0] = 3
+    else:
+        other_values[1000] = other_values[1001]
+    assert content_hash(values) == content_hash(values.copy())
+    assert content_hash(values) != content_hash(other_values)
+
+
+def test_evaluation_cache_with_extension_array(evaluation_cache):
+    y_test = pd.array([1, 2] * 1000, dtype="Int64")
+    y_pred = y_test.copy()
+    y_pred[0] = 2
+    create_confusion_matrix(y_test, y_test)
+    result = create_confusion_matrix(y_test, y_pred)
+    expected_result = pd.DataFrame([[999, 1], [0, 1000]], index=[1, 2], columns=[1, 2])
+    pd.testing.assert_frame_equal(result, expected_result, check_index_type=False,
+                                  check_column_type=False)
+    assert evaluation_cache.statistics.misses == 2
+
+
+def test_evaluation_cache_skips_unhashable_values(evaluation_cache):
+    func = mock.MagicMock(return_value=pd.DataFrame())
+    with pytest.raises(cache_module.UnhashableValueError):
+        content_hash(object())
+    evaluation_cache.get_or_compute(lambda values: func(values), (object(),), {})
+    evaluation_cache.get_or_compute(lambda values: func(values), (object(),), {})
+    assert func.call_count == 2
+    assert evaluation_cache.statistics == (0, 0, 0)
+
+
+def test_evaluation_cache_key_depends_on_versions(evaluation_cache):
+    key = evaluation_cache.key(create_confusion_matrix.__wrapped__, ([1, 2], [2, 1]), {})
+    with mock.patch.object(cache_module, "ENVIRONMENT", "ml_model_utils=0.0.0"):
+        other_key = evaluation_cache.key(create_confusion_matrix.__wrapped__,
+                                         ([1, 2], [2, 1]), {})
+    assert key != other_key
+
+
+@pytest.mark.parametrize("error", [AttributeError, ModuleNotFoundError, TypeError])
+def test_evaluation_cache_unreadable_disk_file(evaluation_cache, error):
+    create_confusion_matrix([1, 2], [2, 1])
+    disk_cache = enable_cache(evaluation_cache.directory)
+    with mock.patch.object(cache_module.pickle, "load", side_effect=error):
+        create_confusion_matrix([1, 2], [2, 1])
+    assert disk_cache.statistics == (0, 0, 1)
+
+
+def test_evaluation_cache_failed_write(tmp_path):
+    evaluation_cache = EvaluationCache(str(tmp_path))
+    with mock.patch.object(cache_module.pickle, "dump", side_effect=OSError("disk full")):
+        with pytest.warns(UserWarning):
+            result = evaluation_cache.get_or_compute(create_confusion_matrix.__wrapped__,
+                                                     ([1, 2], [2, 1]), {})
+    assert result.shape == (2, 2)
+    assert not list(tmp_path.iterdir())
+
+
+def test_evaluation_cache_clear_concurrently_removed_files(evaluation_cache):
+    create_confusion_matrix([1, 2], [2, 1])
+    with mock.patch.object(cache_module.os, "remove", side_effect=FileNotFoundError):
+        evaluation_cache.clear()
+    assert evaluation_cache.statistics == (0, 0, 0)
+
+
+def test_evaluation_cache_temporary_files(tmp_path):
+    stale_path = tmp_path / "stale.tmp"
+    fresh_path = tmp_path / "fresh.tmp"
+    stale_path.write_bytes(b"0" * 100)
+    fresh_path.write_bytes(b"0" * 100)
+    stale_time = cache_module.time.time() - 2 * cache_module.TEMPORARY_FILE_MAX_AGE
+    cache_module.os.utime(stale_path, (stale_time, stale_time))
+    evaluation_cache = EvaluationCache(str(tmp_path), max_disk_bytes=100)
+    evaluation_cache.get_or_compute(create_confusion_matrix.__wrapped__, ([1, 2], [2, 1]), {})
+    # the fresh temporary file alone fills the disk tier, so the new result gets evicted
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["fresh.tmp"]
+    evaluation_cache.clear()
+    assert not list(tmp_path.iterdir())
@@ -1,8 +1,11 @@
+import numpy as np
 import pandas as pd
 import pytest
+from unittest import mock
 
 from ml_model_utils.evaluation import (
-    create_confusion_matrix, create_classification_report
+    create_confusion_matrix, create_classification_report, select_top_confused,
+    create_comparison_report, create_agreement_report
 )
 
 
@@ -49,3 +52,100 @@ def test_create_classification_report():
 def test_create_confusion_matrix(y_test, y_pred, percentage, expected_result):
     result = create_confusion_matrix(y_test, y_pred, percentage)
     pd.testing.assert_frame_equal(result, expected_result)
+
+
+@pytest.mark.parametrize("aggregate_others, expected_result",
+                         [(False, pd.DataFrame([[1, 0], [2, 0]], index=[3, 2], columns=[3, 2])),
+                          (True, pd.DataFrame([[1, 0, 1], [2, 0, 0], [0, 0, 1]],
+                                              index=[3, 2, "other"],
+                                              columns=[3, 2, "other"]))])
+def test_select_top_confused(aggregate_others, expected_result):
+    cm_df = create_confusion_matrix([1, 2, 2, 3, 3], [1, 3, 3, 3, 4],
+                                    selected_labels=[1, 2, 3, 4])
+    result = select_top_confused(cm_df, 2, aggregate_others)
+    pd.testing.assert_frame_equal(result, expected_result)
+    assert select_top_confused(cm_df, 10) is cm_df
+
+
+def _to_arrow(values):
+    pa = pytest.importorskip("pyarrow")
+    return pa.array(values).dictionary_encode()
+
+
+@pytest.mark.parametrize("convert_test, convert_pred",
+                         [(pd.Categorical, pd.Categorical),
+                          (lambda v: pd.Series(v, dtype="category"), list),
+                          (list, lambda v: pd.Categorical(v, categories=["d", "c", "b", "a", "e"])),
+                          (_to_arrow, _to_arrow)])
+def test_categorical_input(convert_test, convert_pred):
+    y_test = ["a", "b", "c", "a", "b", "c", "a", "d"]
+    y_pred = ["a", "c", "c", "b", "b", "a", "a", "e"]
+    result = create_classification_report(convert_test(y_test), convert_pred(y_pred))
+    pd.testing.assert_frame_equal(result, create_classification_report(y_test, y_pred))
+    result = create_confusion_matrix(convert_test(y_test), convert_pred(y_pred))
+    pd.testing.assert_frame_equal(result, create_confusion_matrix(y_test, y_pred),
+                                  check_index_type=False, check_column_type=False)
+    result = create_confusion_matrix(convert_test(y_test), convert_pred(y_pred),
+                                     percentage=True, selected_labels=["c", "a", "f"])
+    expected_result = create_confusion_matrix(y_test, y_pred, percentage=True,
+                                              selected_labels=["c", "a", "f"])
+    pd.testing.assert_frame_equal(result, expected_result,
+                                  check_index_type=False, check_column_type=False)
+
+
+def test_categorical_input_with_missing_labels():
+    with pytest.raises(ValueError):
+        create_classification_report(pd.Categorical(["a", None]), ["a", "b"])
+
+
+@pytest.mark.parametrize("convert", [list, pd.Categorical])
+def test_create_comparison_report(convert):
+    y_test = ["a", "b", "c", "a", "b", "c"]
+    predictions = dict(champion=["a", "b", "c", "a", "b", "a"],
+                       challenger=["a", "c", "c", "b", "b", "d"])
+    result = create_comparison_report(convert(y_test),
+                                      {k: convert(v) for k, v in predictions.items()})
+    assert list(result.index) == ["champion", "challenger"]
+    for name, y_pred in predictions.items():
+        report = create_classification_report(y_test, y_pred)
+        assert result.loc[name, "accuracy"] == pytest.approx(report.loc["accuracy", "recall"])
+        for avg in ["macro avg", "weighted avg"]:
+            for metric in ["precision", "recall", "f1-score"]:
+                assert result.loc[name, f"{avg} {metric}"] == \
+                    pytest.approx(report.loc[avg, metric])
+        assert result.loc[name, "support"] == 6
+
+
+@pytest.mark.parametrize("chunk_size", [2 ** 20, 3])
+def test_create_agreement_report(chunk_size):
+    y_test = [1, 2, 3, 4]
+    predictions = dict(m1=[1, 2, 3, 1], m2=[1, 3, 2, 1], m3=[1, 3, 3, 2])
+    with mock.patch("ml_model_utils.evaluation.COMPARISON_CHUNK_SIZE", chunk_size):
+        table = create_comparison_report(y_test, predictions)
+        result = create_agreement_report(y_test, predictions)
+    assert list(table["exclusive correct"]) == [1, 0, 0]
+    assert list(table["accuracy"]) == [0.75, 0.25, 0.5]
+    expected_result = pd.DataFrame(dict(n_correct=[3, 1, 2, 0],
+                                        n_distinct=[1, 2, 2, 2],
+                                        all_agree=[True, False, False, False]))
+    pd.testing.assert_frame_equal(result, expected_result, check_dtype=False)
+
+
+def test_arrow_input_is_not_copied():
+    pa = pytest.importorskip("pyarrow")
+    from ml_model_utils.evaluation import _encode_categorical
+    y_test = pa.array(["a", "b", "c", "a"]).dictionary_encode()
+    y_pred = pa.chunked_array([pa.array(["a", "b"]).dictionary_encode(),
+                               pa.array(["c", "c"]).dictionary_encode()])
+    (codes_test, codes_pred), categories = _encode_categorical(y_test, y_pred)
+    assert np.shares_memory(codes_test, y_test.indices.to_numpy())
+    assert list(categories[codes_pred]) == ["a", "b", "c", "c"]
+    pd.testing.assert_frame_equal(create_classification_report(y_test, y_pred),
+                                  create_classification_report(["a", "b", "c", "a"],
+                                                               ["a", "b", "c", "c"]))
+
+
+@pytest.mark.parametrize("func", [create_classification_report, create_confusion_matrix])
+def test_categorical_input_with_inconsistent_length(func):
+    with pytest.raises(ValueError, match="inconsistent numbers of samples"):
+        func(pd.Categorical(["a", "b", "a"]), ["a", "b"])
@@ -0,0 +1,82 @@
+import matplotlib.pyplot as plt
+import pandas as pd
+import pytest
+from ml_model_utils.constants import PlotKind
+from ml_model_utils.plotting import (
+    plot_confusion_matrix, render_confusion_matrix, render_distribution_hist, render_batch,
+    _confusion_matrix_figure
+)
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+@pytest.mark.parametrize("n_labels, percentage, top_k",
+                         [(5, False, None), (5, True, None), (100, False, None),
+                          (100, True, 10)])
+def test_render_confusion_matrix(n_labels, percentage, top_k):
+    y_test = [i % n_labels for i in range(1000)]
+    y_pred = [(i * 7) % n_labels for i in range(1000)]
+    result = render_confusion_matrix(y_test, y_pred, 1, percentage=percentage,
+                                     top_k=top_k, aggregate_others=True)
+    assert result.startswith(PNG_HEADER)
+
+
+@pytest.mark.parametrize("n_labels, annotation_threshold, expected_texts",
+                         [(5, 30, 25), (5, 5, 25), (6, 5, 0), (50, 30, 0)])
+def test_confusion_matrix_figure(n_labels, annotation_threshold, expected_texts):
+    y_test = [i % n_labels for i in range(1000)]
+    y_pred = [(i * 7) % n_labels for i in range(1000)]
+    fig = _confusion_matrix_figure(y_test, y_pred, 1, False, None, None, False,
+                                   annotation_threshold, 100)
+    ax = fig.axes[0]
+    assert len(ax.images) == 1
+    assert ax.images[0].get_array().shape == (n_labels, n_labels)
+    assert len(ax.texts) == expected_texts
+    assert len(ax.get_xticks()) == (n_labels if expected_texts else 0)
+
+
+@pytest.mark.parametrize("aggregate_others, expected_labels",
+                         [(False, ["3", "2"]), (True, ["3", "2", "other"])])
+def test_confusion_matrix_figure_top_k(aggregate_others, expected_labels):
+    fig = _confusion_matrix_figure([1, 2, 2, 3, 3], [1, 3, 3, 3, 4], 1, False, [1, 2, 3, 4],
+                                   2, aggregate_others, 30, 100)
+    ax = fig.axes[0]
+    assert ax.images[0].get_array().shape == (len(expected_labels), len(expected_labels))
+    assert [label.get_text() for label in ax.get_xticklabels()] == expected_labels
+    assert [label.get_text() for label in ax.get_yticklabels()] == expected_labels
+    assert len(ax.texts) == len(expected_labels) ** 2
+
+
+def test_plot_confusion_matrix_to_file(tmp_path):
+    plt.close("all")
+    output_path = tmp_path / "cm.png"
+    plot_confusion_matrix([1, 2, 3], [1, 3, 2], 1, output_path=str(output_path))
+    assert output_path.read_bytes().startswith(PNG_HEADER)
+    assert plt.get_fignums() == []
+
+
+def test_render_confusion_matrix_to_file(tmp_path):
+    output_path = tmp_path / "cm.png"
+    result = render_confusion_matrix([1, 2, 3], [1, 3, 2], 1, output_path=str(output_path))
+    assert result is None
+    assert output_path.read_bytes().startswith(PNG_HEADER)
+
+
+def test_render_distribution_hist():
+    data = pd.DataFrame(dict(target=["a", "b", "b", "c", "c", "c"]))
+    result = render_distribution_hist(data, "target", 1)
+    assert result.startswith(PNG_HEADER)
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_render_batch(tmp_path, max_workers):
+    data = pd.DataFrame(dict(target=["a", "b", "b"]))
+    output_path = tmp_path / "dist.png"
+    specs = [dict(kind=PlotKind.CONFUSION_MATRIX, y_test=[1, 2, 3], y_pred=[1, 3, 2],
+                  figure_size=1),
+             dict(kind="distribution_hist", data=data, col="target", figure_size=1,
+                  output_path=str(output_path))]
+    result = render_batch(specs, max_workers=max_workers)
+    assert result[0].startswith(PNG_HEADER)
+    assert result[1] == str(output_path)
+    assert output_path.read_bytes().startswith(PNG_HEADER)